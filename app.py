@@ -1,13 +1,17 @@
 import streamlit as st
 import os
-import base64
-import json
+import orjson
 import re
 from pathlib import Path
-import google.generativeai as genai
-from github import Github, RateLimitExceededException, UnknownObjectException
 import time
 import io
+import datetime
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
 
 # --- Page configuration ---
 st.set_page_config(page_title="ByeResume - Ayushman Tomar", layout="wide")
@@ -22,6 +26,100 @@ This app analyzes your GitHub projects and resume against job descriptions to pr
 4. Tips for interview preparation
 """)
 
+# --- Gemini settings shared by all requests ---
+GEMINI_MODEL_NAME = 'gemini-1.5-flash-001' # Context caching only accepts pinned model versions
+GEMINI_GENERATION_CONFIG = {"temperature": 0.1}
+GEMINI_CONTEXT_CACHE_TTL = datetime.timedelta(minutes=10)
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = 32768 # Smallest context Gemini 1.5 will cache
+GEMINI_CLIENT_CACHE_MAX_KEYS = 32 # API keys whose clients/model are kept in memory at once
+GEMINI_CLIENT_CACHE_TTL = datetime.timedelta(hours=1) # Cached clients/model are dropped this long after creation
+# Tokens allowed for the GitHub section of the prompt. Sized above the caching minimum so that,
+# with the resume and instructions, README-heavy profiles (where caching pays off) can reach it
+GITHUB_PROMPT_TOKEN_BUDGET = 40000
+CHARS_PER_TOKEN = 4 # Rough Gemini tokens-per-character ratio for English text
+SYSTEM_INSTRUCTIONS = """## Role: Resume optimization and job application assistant
+
+You are an AI assistant specialized in resume optimization and job application strategy. Analyze the provided resume content, GitHub project information (limited to name, description, and README), and job description to provide highly relevant and actionable advice.
+Base every answer *only* on the provided resume and GitHub data. Do not include any information not present in the provided inputs."""
+ANALYSIS_FORMAT_INSTRUCTIONS = """### Analysis Format:
+When asked to produce an analysis, generate the following sections based *only* on the provided content (resume, GitHub data, job description). Ensure the suggested skills and projects are directly supported by the resume or the GitHub data provided.
+Format the output clearly using **Bolded Section Titles with Numbering** as shown below. Include a brief introductory sentence for sections 1, 2, and 4 if appropriate.
+
+**1. Skills to Highlight**
+[Introductory sentence]
+*   Skill Name: Explanation linking to job description and source (resume/github)
+
+**2. Projects to Showcase**
+[Introductory sentence]
+*   **Project Name**: Professional description (approx. 100-150 words) highlighting relevance to the job.
+
+**3. Resume Objective**
+[Compelling objective statement, 3-4 sentences.]
+
+**4. Interview Preparation Tips**
+[Introductory sentence]
+*   **Technical/Domain Areas to Review:** List specific areas based on job/background.
+*   **Example Interview Questions:** List relevant questions.
+*   **Strategic Advice:** Offer tips for discussing experience.
+
+Do not add extra sections or formatting not requested."""
+
+# --- Sections expected in the analysis response, matched in a single pass ---
+ANALYSIS_SECTION_TITLES = ["Skills to Highlight", "Projects to Showcase", "Resume Objective", "Interview Preparation Tips"]
+SECTION_RE = re.compile(
+    r"(?:^|\n)\s*\*\*(?:\d+\.\s+)?(" + "|".join(re.escape(title) for title in ANALYSIS_SECTION_TITLES) + r")\*\*"
+    r"(.*?)(?=\n\s*\*\*(?:\d+\.\s+)?.*?\*\*|\Z)",
+    re.DOTALL | re.IGNORECASE,
+)
+
+# --- GitHub GraphQL query for repositories and their READMEs ---
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GITHUB_README_WORKERS = 16
+README_MAX_CHARS = 8000
+README_MAX_BYTES = README_MAX_CHARS * 4 # Raw README bytes decoded before cleaning and truncation
+README_CODE_FENCE_RE = re.compile(r"```.*?```", re.DOTALL)
+README_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+README_EMPTY_LINK_RE = re.compile(r"\[\s*\]\([^)]*\)") # Left behind by linked badges
+README_HTML_RE = re.compile(r"<[^>]+>")
+README_SPACES_RE = re.compile(r"[ \t]+")
+README_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+GITHUB_REPOS_QUERY = """
+query($login: String!, $count: Int!) {
+  repositoryOwner(login: $login) { # Users and organizations alike
+    repositories(first: $count, privacy: PUBLIC, isFork: false, ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      totalCount
+      nodes {
+        name
+        description
+        readmeMd: object(expression: "HEAD:README.md") { ... on Blob { text } }
+        readmeLowerMd: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+        readmeRst: object(expression: "HEAD:README.rst") { ... on Blob { text } }
+        readmeTxt: object(expression: "HEAD:README") { ... on Blob { text } }
+      }
+    }
+  }
+}
+"""
+
+# --- Errors raised by the GitHub fetch helpers ---
+class GithubException(Exception):
+    """A GitHub API request failed with the given HTTP status and response body."""
+    def __init__(self, status, data=None, headers=None):
+        super().__init__(status, data)
+        self.status = status
+        self.data = data
+        self.headers = headers or {}
+
+    def __str__(self):
+        return f"{self.status} {self.data}"
+
+class RateLimitExceededException(GithubException):
+    """The GitHub API rate limit is exhausted."""
+
+class UnknownObjectException(GithubException):
+    """The requested GitHub user or resource does not exist."""
+
 # --- Global variable to store uploaded file content ---
 # Using session state is generally preferred for keeping state across reruns
 if 'uploaded_resume_content' not in st.session_state:
@@ -29,13 +127,131 @@ if 'uploaded_resume_content' not in st.session_state:
 if 'uploaded_resume_filename' not in st.session_state:
     st.session_state.uploaded_resume_filename = None
 
-# --- Function to fetch repositories from GitHub ---
-def fetch_github_repos(username, github_token_from_input=None):
+# --- Function to strip README noise before it reaches the prompt ---
+def _clean_readme(md):
+    """Removes code fences, images/badges, HTML tags and extra whitespace from README markdown."""
+    md = README_CODE_FENCE_RE.sub("", md)
+    md = README_IMAGE_RE.sub("", md)
+    md = README_EMPTY_LINK_RE.sub("", md)
+    md = README_HTML_RE.sub("", md)
+    md = README_SPACES_RE.sub(" ", md)
+    return README_BLANK_LINES_RE.sub("\n\n", md).strip()
+
+# --- Function to fetch repositories from GitHub in one GraphQL request ---
+def fetch_github_repos_graphql(username, github_token, max_repos_to_process=50):
     """
-    Fetches GitHub repositories for a given username using authentication if available.
-    Includes name, description, and README content. Only fetches non-forked repositories.
-    Priority for token: Input field > Streamlit secrets > Environment variable.
+    Fetches name, description and README text of up to `max_repos_to_process` non-forked
+    repositories with a single GraphQL request instead of one REST call per README.
+    GitHub's GraphQL API requires a token. Raises GithubException (or a subclass) on failure so callers
+    can handle both code paths the same way.
     """
+    import requests
+    response = requests.post(
+        GITHUB_GRAPHQL_URL,
+        json={"query": GITHUB_REPOS_QUERY, "variables": {"login": username, "count": max_repos_to_process}},
+        headers={"Authorization": f"bearer {github_token}"},
+        timeout=15,
+    )
+    if response.status_code in (403, 429) and response.headers.get("x-ratelimit-remaining") == "0":
+        raise RateLimitExceededException(response.status_code, response.text, dict(response.headers))
+    if response.status_code != 200:
+        raise GithubException(response.status_code, response.text, dict(response.headers))
+
+    payload = response.json()
+    for error in payload.get("errors") or []:
+        if error.get("type") == "NOT_FOUND":
+            raise UnknownObjectException(404, payload, dict(response.headers))
+        if error.get("type") == "RATE_LIMITED":
+            raise RateLimitExceededException(403, payload, dict(response.headers))
+        raise GithubException(response.status_code, payload, dict(response.headers))
+
+    owner = payload["data"]["repositoryOwner"]
+    if owner is None: # Unknown logins resolve to null rather than a NOT_FOUND error here
+        raise UnknownObjectException(404, payload, dict(response.headers))
+    repositories = owner["repositories"]
+    if repositories["totalCount"] > max_repos_to_process:
+        st.sidebar.info(f"Stopped fetching after processing {max_repos_to_process} non-forked repos to manage API usage.")
+
+    repo_data = []
+    for node in repositories["nodes"]:
+        readme_blob = node["readmeMd"] or node["readmeLowerMd"] or node["readmeRst"] or node["readmeTxt"]
+        readme_content = (readme_blob or {}).get("text") or "" # Binary blobs have no text
+        repo_data.append({
+            "name": node["name"],
+            "description": node["description"] or "No description provided.",
+            "readme": _clean_readme(readme_content)[:README_MAX_CHARS] # Limit readme size
+        })
+    return repo_data
+
+# --- Function to make conditional GitHub REST requests ---
+def github_rest_get(url, etag_cache, github_token=None, params=None, raw=False):
+    """
+    GETs a GitHub REST endpoint, sending the stored ETag as If-None-Match.
+    On 304 Not Modified the stored payload is returned, saving the response body; only
+    authenticated 304s are exempt from the rate limit, so unauthenticated ones still count. `etag_cache` maps request URL -> (etag, payload) and is updated in place.
+    With `raw=True` the file contents are requested directly and returned as bytes.
+    """
+    import requests
+    accept = "application/vnd.github.raw" if raw else "application/vnd.github+json"
+    cache_key = f"{accept} {requests.Request('GET', url, params=params).prepare().url}"
+    headers = {"Accept": accept}
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    cached = etag_cache.get(cache_key)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+
+    response = requests.get(url, params=params, headers=headers, timeout=10)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    if response.status_code in (403, 429) and response.headers.get("x-ratelimit-remaining") == "0":
+        raise RateLimitExceededException(response.status_code, response.text, dict(response.headers))
+    if response.status_code == 404:
+        raise UnknownObjectException(404, response.text, dict(response.headers))
+    if response.status_code != 200:
+        raise GithubException(response.status_code, response.text, dict(response.headers))
+
+    payload = response.content if raw else response.json()
+    if response.headers.get("ETag"):
+        etag_cache[cache_key] = (response.headers["ETag"], payload)
+    return payload
+
+def list_user_repos(username, etag_cache, github_token=None):
+    """
+    Returns up to 100 of a user's own repositories (most recently updated first) in a single
+    request; forks are filtered by the caller.
+    """
+    return github_rest_get(
+        f"{GITHUB_API_URL}/users/{username}/repos",
+        etag_cache,
+        github_token,
+        params={"per_page": 100, "sort": "updated", "direction": "desc", "type": "owner"},
+    )
+
+def _safe_get_readme(repo, etag_cache, rate_limited):
+    """
+    Fetches and decodes a repository README, returning "" if it is missing or fails.
+    Runs on a worker thread; once any worker hits the rate limit, `rate_limited` is set
+    and the remaining workers skip their requests.
+    """
+    if rate_limited.is_set():
+        return ""
+    try:
+        # Raw media type returns the file bytes directly instead of base64 inside JSON
+        readme_bytes = github_rest_get(f"{GITHUB_API_URL}/repos/{repo['full_name']}/readme", etag_cache, raw=True)
+        readme_text = readme_bytes[:README_MAX_BYTES].decode('utf-8', errors='ignore')
+        return _clean_readme(readme_text)[:README_MAX_CHARS]
+    except RateLimitExceededException:
+        rate_limited.set()
+    except UnknownObjectException:
+        pass # README not found
+    except Exception:
+        pass # Other errors decoding/fetching readme
+    return ""
+
+# --- Function to pick the GitHub token to use ---
+def resolve_github_token(github_token_from_input=None):
+    """Returns the GitHub token to use. Priority: Input field > Streamlit secrets > Environment variable."""
     github_token = github_token_from_input # Prioritize token from input field
 
     if not github_token:
@@ -47,66 +263,117 @@ def fetch_github_repos(username, github_token_from_input=None):
 
     if not github_token:
         github_token = os.environ.get("GITHUB_TOKEN")
+    return github_token
 
-    try:
-        if github_token:
-            g = Github(github_token)
-        else:
-            g = Github()
-            st.sidebar.warning(
-                "No GitHub token provided (checked input, secrets & env var). "
-                "Using unauthenticated access (low rate limits: ~60/hr). "
-                "May hit 'Rate Limit Exceeded'. Add a token for higher limits.", icon="⚠️"
-            )
-            rate_limit_info = g.get_rate_limit()
-            st.sidebar.caption(f"GitHub API (Unauth): {rate_limit_info.core.remaining}/{rate_limit_info.core.limit} requests remaining.")
-
-        user = g.get_user(username)
-        repos = user.get_repos(sort="updated", direction="desc")
-
-        repo_data = []
-        processed_count = 0
-        max_repos_to_process = 50
-
-        for repo in repos:
-            if not repo.fork:
-                if processed_count >= max_repos_to_process:
-                    st.sidebar.info(f"Stopped fetching after processing {max_repos_to_process} non-forked repos to manage API usage.")
-                    break
-
-                readme_content = ""
-                try:
-                    readme = repo.get_readme()
-                    readme_bytes = base64.b64decode(readme.content)
-                    readme_content = readme_bytes.decode('utf-8', errors='ignore')
-                except UnknownObjectException:
-                    pass # README not found
-                except Exception:
-                    pass # Other errors decoding/fetching readme
-
-                repo_info = {
-                    "name": repo.name,
-                    "description": repo.description or "No description provided.",
-                    "readme": readme_content[:8000] if readme_content else "" # Limit readme size
-                }
-                repo_data.append(repo_info)
-                processed_count += 1
-
-        if not repo_data and processed_count == 0:
-             st.sidebar.warning(f"No non-forked public repositories found for user '{username}'.") # Use sidebar warning for fetch info
+# --- Function to fetch repositories from GitHub ---
+def fetch_github_repos(username, github_token_from_input=None):
+    """
+    Fetches GitHub repositories for a given username using authentication if available.
+    Includes name, description, and README content. Only fetches non-forked repositories.
+    With a token, everything is fetched in one GraphQL request; without one, falls back to REST.
+    Raises on failure (GithubException subclasses, network errors) instead of returning [],
+    so a failed fetch is never cached.
+    """
+    import requests
+    github_token = resolve_github_token(github_token_from_input)
+
+    if github_token:
+        repo_data = fetch_github_repos_graphql(username, github_token)
+        if not repo_data:
+            st.sidebar.warning(f"No non-forked public repositories found for user '{username}'.")
         return repo_data
 
+    st.sidebar.warning(
+        "No GitHub token provided (checked input, secrets & env var). "
+        "Using unauthenticated access (low rate limits: ~60/hr). "
+        "May hit 'Rate Limit Exceeded'. Add a token for higher limits.", icon="⚠️"
+    )
+    # /rate_limit does not count against the rate limit itself
+    rate_limit_info = requests.get(f"{GITHUB_API_URL}/rate_limit", timeout=10).json()["resources"]["core"]
+    st.sidebar.caption(f"GitHub API (Unauth): {rate_limit_info['remaining']}/{rate_limit_info['limit']} requests remaining.")
+
+    # ETags survive reruns so unchanged repo lists and READMEs come back as bodyless 304s.
+    # Unauthenticated 304s still count against the 60/hr limit: this saves bandwidth only.
+    etag_cache = st.session_state.setdefault("gh_etag_cache", {})
+
+    repos = []
+    max_repos_to_process = 50
+
+    for repo in list_user_repos(username, etag_cache):
+        if not repo["fork"]:
+            if len(repos) >= max_repos_to_process:
+                st.sidebar.info(f"Stopped fetching after processing {max_repos_to_process} non-forked repos to manage API usage.")
+                break
+            repos.append(repo)
+
+    # README requests are independent round-trips, so fetch them concurrently
+    rate_limited = threading.Event()
+    with ThreadPoolExecutor(max_workers=GITHUB_README_WORKERS) as executor:
+        readmes = list(executor.map(lambda repo: _safe_get_readme(repo, etag_cache, rate_limited), repos))
+
+    repo_data = []
+    for repo, readme_content in zip(repos, readmes):
+        repo_info = {
+            "name": repo["name"],
+            "description": repo["description"] or "No description provided.",
+            "readme": readme_content[:README_MAX_CHARS] if readme_content else "" # Limit readme size
+        }
+        repo_data.append(repo_info)
+
+    if not repo_data:
+         st.sidebar.warning(f"No non-forked public repositories found for user '{username}'.") # Use sidebar warning for fetch info
+    return repo_data
+
+# --- Cached GitHub fetch shared by the preview and both buttons ---
+@st.cache_data(ttl=600, show_spinner=False) # Cache for 10 minutes
+def cached_fetch_github_repos(username, token_hash, refresh_nonce, _token):
+    """
+    Cached wrapper around fetch_github_repos. Keyed on username and a hash of the token so
+    the PAT itself never becomes part of the cache key (`_token` is excluded from hashing).
+    A new `refresh_nonce` forces a fresh fetch for just this user and token.
+    Returns (repo_data, github_json); the prompt JSON is serialized once per fetch.
+    """
+    repo_data = fetch_github_repos(username, _token)
+    return repo_data, serialize_github_data(repo_data)
+
+def get_github_repos(username, token, refresh=False):
+    """
+    Returns (repositories, prompt JSON) for the user, served from cache when available.
+    With `refresh=True` this session gets freshly fetched data from now on; other users'
+    cache entries are left alone.
+    """
+    token_hash = hashlib.sha256((token or "").encode("utf-8")).hexdigest()
+    refresh_nonces = st.session_state.setdefault("github_refresh_nonces", {})
+    nonce_key = f"{username}:{token_hash}"
+    if refresh:
+        refresh_nonces[nonce_key] = time.time()
+    try:
+        return cached_fetch_github_repos(username, token_hash, refresh_nonces.get(nonce_key, 0), token)
     except RateLimitExceededException:
         st.error(f"GitHub API Rate Limit Exceeded. Please wait a while before trying again.")
-        if not github_token:
+        if not resolve_github_token(token):
             st.error("Consider adding a GitHub Personal Access Token to significantly increase the rate limit.")
-        return []
     except UnknownObjectException:
          st.error(f"GitHub user '{username}' not found. Please check the username.")
-         return []
     except Exception as e:
         st.error(f"An unexpected error occurred while fetching GitHub repositories: {type(e).__name__} - {str(e)}")
-        return []
+    # Failures are not cached, so the next call fetches again
+    return [], serialize_github_data([])
+
+# --- Function to decode an uploaded resume ---
+def decode_resume_bytes(bytes_data):
+    """
+    Decodes uploaded resume bytes as UTF-8, falling back to charset detection for files
+    saved in other encodings (e.g. CP1252 exports with smart quotes).
+    """
+    try:
+        return bytes_data.decode("utf-8")
+    except UnicodeDecodeError:
+        from charset_normalizer import from_bytes
+        best_match = from_bytes(bytes_data).best()
+        if best_match is None:
+            raise
+        return str(best_match)
 
 # --- Function to get resume content (MODIFIED) ---
 def get_resume_content():
@@ -121,8 +388,187 @@ def get_resume_content():
         # No uploaded file in session state
         return "", "none"
 
+# --- Gemini clients and model, shared across reruns ---
+@st.cache_resource(show_spinner=False, max_entries=GEMINI_CLIENT_CACHE_MAX_KEYS, ttl=GEMINI_CLIENT_CACHE_TTL)
+def get_gemini_clients(api_key):
+    """
+    Returns (generative client, cache client) bound to `api_key`, built once per key.
+    genai.configure() would set a single process-wide key that sessions on a shared
+    server overwrite for each other, so every call goes through these clients instead.
+    """
+    from google.ai import generativelanguage as glm
+    client_options = {"api_key": api_key}
+    return glm.GenerativeServiceClient(client_options=client_options), glm.CacheServiceClient(client_options=client_options)
+
+def _bind_gemini_client(model, api_key):
+    """
+    Points `model` at the client for `api_key` instead of genai's global default client.
+    GenerativeModel has no public way to take a client, so this sets its private `_client`,
+    which google-generativeai==0.7.2 (pinned in requirements.txt) uses for every
+    generate_content call. Re-check this when upgrading the package.
+    """
+    model._client = get_gemini_clients(api_key)[0]
+    return model
+
+@st.cache_resource(show_spinner=False, max_entries=GEMINI_CLIENT_CACHE_MAX_KEYS, ttl=GEMINI_CLIENT_CACHE_TTL)
+def get_gemini_model(api_key):
+    """Builds the model once per API key, bound to that key's client."""
+    import google.generativeai as genai
+    return _bind_gemini_client(
+        genai.GenerativeModel(GEMINI_MODEL_NAME, generation_config=GEMINI_GENERATION_CONFIG), api_key
+    )
+
+# --- Functions to build prompts with a stable, cacheable prefix ---
+def estimate_tokens(text):
+    """Approximates the Gemini token count of `text` without an API call."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def fit_github_data_to_budget(github_data, token_budget=GITHUB_PROMPT_TOKEN_BUDGET):
+    """
+    Trims README excerpts so the whole GitHub section fits in `token_budget` tokens.
+    The budget left after names/descriptions is split across READMEs in proportion to each
+    repo's relevance (update recency, then description length); budget not needed by short
+    READMEs is redistributed to the rest. Deterministic, so the prompt prefix stays stable.
+    """
+    repo_count = len(github_data)
+    weights = [
+        (repo_count - rank) + min(len(repo.get("description") or ""), 200) / 50
+        for rank, repo in enumerate(github_data) # Repos arrive most recently updated first
+    ]
+    remaining = token_budget - sum(
+        estimate_tokens(repo.get("name") or "") + estimate_tokens(repo.get("description") or "") for repo in github_data
+    )
+    readme_tokens = [estimate_tokens(repo.get("readme") or "") for repo in github_data]
+    allowances = [0] * repo_count
+
+    pending = [i for i in range(repo_count) if readme_tokens[i] > 0]
+    while pending and remaining > 0:
+        total_weight = sum(weights[i] for i in pending)
+        shares = {i: int(remaining * weights[i] / total_weight) for i in pending}
+        satisfied = [i for i in pending if readme_tokens[i] <= shares[i]]
+        if not satisfied:
+            # Every remaining README is larger than its share: hand out the shares and stop
+            for i in pending:
+                allowances[i] = shares[i]
+            break
+        for i in satisfied:
+            allowances[i] = readme_tokens[i]
+            remaining -= readme_tokens[i]
+        pending = [i for i in pending if i not in satisfied]
+
+    return [
+        {**repo, "readme": (repo.get("readme") or "")[:allowance * CHARS_PER_TOKEN]}
+        for repo, allowance in zip(github_data, allowances)
+    ]
+
+def serialize_github_data(github_data):
+    """
+    Returns the budget-fitted GitHub data as compact JSON with sorted keys, so the same
+    repositories always serialize to the same bytes.
+    """
+    github_data = fit_github_data_to_budget(github_data)
+    return orjson.dumps(github_data, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+
+def build_stable_prefix(github_json, resume_text):
+    """
+    Returns the prompt prefix shared by every request: instructions, resume and GitHub data.
+    Must stay byte-identical across both buttons and reruns so Gemini can reuse its cache.
+    """
+    return (
+        f"{SYSTEM_INSTRUCTIONS}\n\n"
+        f"### Resume Content:\n```\n{resume_text}\n```\n\n"
+        f"### GitHub Projects (Name, Description, and README excerpts):\n```json\n{github_json}\n```\n\n"
+        f"{ANALYSIS_FORMAT_INSTRUCTIONS}\n\n"
+    )
+
+def build_variable_suffix(task, role, company, job_description, question=None):
+    """Returns the per-request part of the prompt: job details and the task to perform."""
+    suffix = (
+        f"### Job Details:\n"
+        f"- Position: {role}\n"
+        f"- Company: {company}\n"
+        f"- Job Description:\n```\n{job_description}\n```\n\n"
+    )
+    if task == "analyze":
+        suffix += (
+            "## Task: Provide detailed job application optimization based on resume, GitHub projects, and job description\n"
+            "Produce the analysis using the Analysis Format above.\n"
+        )
+    else:
+        suffix += (
+            "## Task: Provide answer to the question asked by the recruiter on behalf of job applicant based on resume, GitHub projects, and job description of the applicant.\n"
+            "Do not use the Analysis Format; answer the question directly in the candidate's voice.\n\n"
+            "Question asked by the recruiter(Answer this question on candidate's behalf taking reference of his github and resume as knowledge base):\n"
+            f"{question}\n"
+        )
+    return suffix
+
+def _build_prompt(stable_prefix, variable_suffix):
+    """Joins the stable prefix and the per-request suffix into a full prompt."""
+    return stable_prefix + variable_suffix
+
+def get_cached_context_model(api_key, stable_prefix):
+    """
+    Returns a Gemini model backed by a CachedContent holding the stable prefix,
+    so only the variable suffix is sent per request.
+    The cache is recreated when the API key, resume file or GitHub data changes.
+    Returns None if the prefix is below Gemini's caching minimum or caching already failed
+    for this prefix, so the caller sends the full prompt without retrying the failed RPC.
+    """
+    if estimate_tokens(stable_prefix) < GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+        return None
+
+    import google.generativeai as genai
+    _, cache_client = get_gemini_clients(api_key)
+    context_hash = hashlib.sha256(
+        f"{api_key}\n{st.session_state.get('uploaded_resume_filename')}\n{stable_prefix}".encode("utf-8")
+    ).hexdigest()
+
+    cached_content = None
+    cache_entry = st.session_state.get("gemini_context_cache")
+    if cache_entry and cache_entry["hash"] == context_hash:
+        if cache_entry["name"] is None:
+            return None # Creating a cache for this prefix already failed
+        try:
+            cached_content = cache_client.get_cached_content(name=cache_entry["name"])
+        except Exception:
+            pass # Cache expired or was deleted, recreate it below
+    elif cache_entry and cache_entry["name"]:
+        try:
+            cache_client.delete_cached_content(name=cache_entry["name"])
+        except Exception:
+            pass # Already expired, or created under a different key
+
+    if cached_content is None:
+        try:
+            cached_content = cache_client.create_cached_content(cached_content=genai.protos.CachedContent(
+                model=f"models/{GEMINI_MODEL_NAME}",
+                contents=[genai.protos.Content(role="user", parts=[genai.protos.Part(text=stable_prefix)])],
+                ttl=GEMINI_CONTEXT_CACHE_TTL,
+            ))
+        except Exception as e:
+            logger.warning("Gemini context caching unavailable, sending full prompt: %s - %s", type(e).__name__, e)
+            st.session_state.gemini_context_cache = {"hash": context_hash, "name": None}
+            return None
+        st.session_state.gemini_context_cache = {"hash": context_hash, "name": cached_content.name}
+
+    return _bind_gemini_client(
+        genai.GenerativeModel.from_cached_content(
+            cached_content=cached_content, generation_config=GEMINI_GENERATION_CONFIG
+        ),
+        api_key,
+    )
+
+def generate_with_context(api_key, stable_prefix, variable_suffix, stream=False):
+    """Sends the variable suffix using the cached prefix, falling back to the full prompt."""
+    cached_model = get_cached_context_model(api_key, stable_prefix)
+    if cached_model is not None:
+        return cached_model.generate_content(variable_suffix, stream=stream)
+    model = get_gemini_model(api_key)
+    return model.generate_content(_build_prompt(stable_prefix, variable_suffix), stream=stream)
+
 # --- Function to analyze with Gemini API ---
-def analyze_with_gemini(github_data, resume_text, job_description, role, company):
+def analyze_with_gemini(github_json, resume_text, job_description, role, company):
     """Sends data to Gemini API for analysis and returns the response text."""
     try:
         api_key = st.session_state.get("gemini_api_key")
@@ -130,57 +576,18 @@ def analyze_with_gemini(github_data, resume_text, job_description, role, company
             st.error("Gemini API key is missing. Please add it in the sidebar.")
             return "Error: Gemini API key is missing."
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest', generation_config={"temperature": 0.1})
-
-        prompt = f"""
-        ## Task: Provide detailed job application optimization based on resume, GitHub projects, and job description
-
-        You are an AI assistant specialized in resume optimization and job application strategy. Analyze the provided resume content, GitHub project information (limited to name, description, and README), and job description to provide highly relevant and actionable advice.
-
-        ### Resume Content:
-        ```
-        {resume_text}
-        ```
-
-        ### GitHub Projects (Name, Description, and README excerpts):
-        ```json
-        {json.dumps(github_data, indent=2)}
-        ```
-
-        ### Job Details:
-        - Position: {role}
-        - Company: {company}
-        - Job Description:
-        ```
-        {job_description}
-        ```
-
-        ### Instructions:
-        Based *only* on the provided content (resume, GitHub data, job description), generate the following sections. Ensure the suggested skills and projects are directly supported by the resume or the GitHub data provided.
-        Format the output clearly using **Bolded Section Titles with Numbering** as shown below. Include a brief introductory sentence for sections 1, 2, and 4 if appropriate.
-
-        **1. Skills to Highlight**
-        [Introductory sentence]
-        *   Skill Name: Explanation linking to job description and source (resume/github)
-
-        **2. Projects to Showcase**
-        [Introductory sentence]
-        *   **Project Name**: Professional description (approx. 100-150 words) highlighting relevance to the job.
-
-        **3. Resume Objective**
-        [Compelling objective statement, 3-4 sentences.]
-
-        **4. Interview Preparation Tips**
-        [Introductory sentence]
-        *   **Technical/Domain Areas to Review:** List specific areas based on job/background.
-        *   **Example Interview Questions:** List relevant questions.
-        *   **Strategic Advice:** Offer tips for discussing experience.
-
-        Do not include any information not present in the provided inputs. Do not add extra sections or formatting not requested.
-        """
-        response = model.generate_content(prompt)
-        return response.text
+        stable_prefix = build_stable_prefix(github_json, resume_text)
+        variable_suffix = build_variable_suffix("analyze", role, company, job_description)
+        response = generate_with_context(api_key, stable_prefix, variable_suffix, stream=True)
+
+        # Show the response as it streams in; sections are parsed once it is complete
+        stream_placeholder = st.empty()
+        analysis_text = ""
+        for chunk in response:
+            analysis_text += chunk.text
+            stream_placeholder.markdown(analysis_text)
+        stream_placeholder.empty()
+        return analysis_text
     except Exception as e:
         st.error(f"Error analyzing with Gemini: {type(e).__name__} - {str(e)}")
         if "API key not valid" in str(e):
@@ -191,19 +598,25 @@ def analyze_with_gemini(github_data, resume_text, job_description, role, company
              st.error("Content was blocked by the Gemini API safety filters. Please review inputs.")
         return f"An error occurred during Gemini analysis: {str(e)}"
 
+# --- Function to split the analysis response into sections ---
+@st.cache_data(show_spinner=False, max_entries=16) # Enough for reruns of recent results across sessions
+def extract_sections(text):
+    """
+    Returns a dict of section title -> content for every section found in one scan of the text.
+    Cached on the response text, so re-rendering the same analysis skips the parse.
+    """
+    titles_by_key = {title.lower(): title for title in ANALYSIS_SECTION_TITLES}
+    sections = {}
+    for match in SECTION_RE.finditer(text):
+        content = match.group(2).strip()
+        if not content or content.startswith("**"):
+            continue
+        sections.setdefault(titles_by_key[match.group(1).lower()], content)
+    return sections
+
 # --- Function to display results ---
 def display_results(analysis_text):
     """Parses and displays the analysis text from Gemini."""
-    def extract_section(text, section_name):
-        pattern = rf"(?:^|\n)\s*\*\*(\d+\.\s+)?{re.escape(section_name)}\*\*(.*?)(?=\n\s*\*\*(\d+\.\s+)?.*?\*\*|\Z)"
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        if match:
-            content = match.group(2).strip()
-            if not content or content.startswith("**"):
-                 return None
-            return content
-        return None
-
     st.subheader("📊 Analysis Results")
     sections_found_count = 0
 
@@ -218,8 +631,9 @@ def display_results(analysis_text):
          st.error("Analysis failed: " + analysis_text)
          return
 
+    sections = extract_sections(analysis_text)
     for section_title, expanded_default in sections_to_display.items():
-        section_content = extract_section(analysis_text, section_title)
+        section_content = sections.get(section_title)
         with st.expander(section_title, expanded=expanded_default):
             if section_content:
                 st.markdown(section_content)
@@ -276,35 +690,39 @@ with st.sidebar:
     st.divider()
     st.header("📄 Data Previews")
 
-    # Toggle to show GitHub data
-    if st.checkbox("Preview Fetched GitHub Projects", key="show_github_sidebar",help="Backend uses readme.md files of github repositories for appropriate analysis, so make sure you have given the access to the files in your access token"):
-        current_gh_username = st.session_state.get("github_username")
-        current_gh_token = st.session_state.get("github_pat")
+    # Fetch GitHub data for the preview only when the button is clicked; a checkbox would
+    # keep refetching on every rerun while it stays ticked
+    preview_clicked = st.button("Preview Fetched GitHub Projects", key="show_github_sidebar",help="Backend uses readme.md files of github repositories for appropriate analysis, so make sure you have given the access to the files in your access token")
+    current_gh_username = st.session_state.get("github_username")
+    current_gh_token = st.session_state.get("github_pat")
+    preview_key = (current_gh_username, current_gh_token)
+    if preview_clicked:
         if current_gh_username:
+            # Clicking again for the same user refreshes their data
+            refresh = st.session_state.get("last_preview_key") == preview_key
             with st.spinner(f"Fetching GitHub data for '{current_gh_username}' preview..."):
-                # Consider adding caching here if preview is used often
-                @st.cache_data(ttl=600) # Cache for 10 minutes
-                def cached_fetch_github_repos(username, token):
-                    return fetch_github_repos(username, token)
-                repos_preview = cached_fetch_github_repos(current_gh_username, current_gh_token)
-                if not repos_preview:
-                    repos_preview = fetch_github_repos(current_gh_username, current_gh_token)
-
+                repos_preview, _ = get_github_repos(current_gh_username, current_gh_token, refresh=refresh)
 
+            preview_markdown = ""
             if isinstance(repos_preview, list) and repos_preview: # Check it's a non-empty list
-                st.write(f"Found {len(repos_preview)} relevant repositories:")
+                preview_lines = [f"Found {len(repos_preview)} relevant repositories:"]
                 for repo_item in repos_preview[:5]: # Preview first 5
-                    st.markdown(f"**{repo_item['name']}** - {repo_item.get('description', 'No description')}")
+                    preview_lines.append(f"**{repo_item['name']}** - {repo_item.get('description', 'No description')}")
                     if repo_item.get('readme'):
-                         st.caption(f"Readme snippet: {repo_item['readme'][:150]}...")
-                    st.markdown("---")
-            elif isinstance(repos_preview, list) and not repos_preview: # Empty list means no repos found
-                 # Warning/info already shown by fetch_github_repos
-                 pass
-            # Error messages displayed by fetch_github_repos()
+                        readme_snippet = " ".join(repo_item['readme'][:150].split())
+                        preview_lines.append(f"> Readme snippet: {readme_snippet}...")
+                    preview_lines.append("---")
+                preview_markdown = "\n\n".join(preview_lines)
+            # Empty list means no repos found; warnings/errors already shown by fetch_github_repos()
+            st.session_state.preview_markdown = preview_markdown
+            st.session_state.last_preview_key = preview_key
         else:
             st.warning("Enter a GitHub username first to preview projects.")
 
+    # Other reruns (e.g. submitting the job form) just redisplay the last preview for this user
+    if st.session_state.get("last_preview_key") == preview_key and st.session_state.get("preview_markdown"):
+        st.markdown(st.session_state.preview_markdown)
+
 
 # --- Main area ---
 
@@ -323,9 +741,9 @@ if uploaded_file is not None:
     # Check if it's a new file upload or the same one from a previous run
     if uploaded_file.name != st.session_state.get("uploaded_resume_filename"):
         try:
-            # Read content as bytes, then decode
+            # Read content as bytes, then decode once; later reruns reuse the session state copy
             bytes_data = uploaded_file.getvalue()
-            st.session_state.uploaded_resume_content = bytes_data.decode("utf-8")
+            st.session_state.uploaded_resume_content = decode_resume_bytes(bytes_data)
             st.session_state.uploaded_resume_filename = uploaded_file.name
             st.success(f"Successfully uploaded and read '{uploaded_file.name}'.")
         except Exception as e:
@@ -351,48 +769,20 @@ else:
 
 
 
-def answer_with_gemini(github_data, resume_text, question,job_role,Company_name,job_description):
-    """Sends data to Gemini API for analysis and returns the response text."""
+def answer_with_gemini(github_json, resume_text, question,job_role,Company_name,job_description):
+    """Sends data to Gemini API and yields the answer text chunk by chunk (for st.write_stream)."""
     try:
         api_key = st.session_state.get("gemini_api_key")
         if not api_key:
             st.error("Gemini API key is missing. Please add it in the sidebar.")
-            return "Error: Gemini API key is missing."
-
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest', generation_config={"temperature": 0.1})
-
-        prompt = f"""## Task: Provide answer to the question asked by the recruiter on behalf of job applicant based on resume, GitHub projects, and job description of the applicant.
-
-        You are an AI assistant specialized in resume optimization and job application strategy. Analyze the provided resume content, GitHub project information (limited to name, description, and README), and job description to provide highly relevant and actionable advice.
-
-        ### Resume Content:
-        ```
-        {resume_text}
-        ```
-
-        ### GitHub Projects (Name, Description, and README excerpts):
-
-        {json.dumps(github_data, indent=2)}
-
-        ### Job Role:
-        {job_role}
-
-        ### Company Name
-
-        {Company_name}
-
-
-        ### Job description
-
-        {job_description}
-
-        Question asked by the recruiter(Answer this question on candidate's behalf taking reference of his github and resume as knowledge base): 
-
-        {question}
-        """
-        response = model.generate_content(prompt)
-        return response.text
+            yield "Error: Gemini API key is missing."
+            return
+
+        stable_prefix = build_stable_prefix(github_json, resume_text)
+        variable_suffix = build_variable_suffix("answer", job_role, Company_name, job_description, question)
+        response = generate_with_context(api_key, stable_prefix, variable_suffix, stream=True)
+        for chunk in response:
+            yield chunk.text
     except Exception as e:
         st.error(f"Error analyzing with Gemini: {type(e).__name__} - {str(e)}")
         if "API key not valid" in str(e):
@@ -401,7 +791,7 @@ def answer_with_gemini(github_data, resume_text, question,job_role,Company_name,
              st.error("Quota exceeded for Gemini API. Check your usage limits or try again later.")
         elif "blocked" in str(e).lower():
              st.error("Content was blocked by the Gemini API safety filters. Please review inputs.")
-        return f"An error occurred during Gemini analysis: {str(e)}"
+        yield f"An error occurred during Gemini analysis: {str(e)}"
 
 
 
@@ -409,139 +799,26 @@ def answer_with_gemini(github_data, resume_text, question,job_role,Company_name,
 
 
 
-# --- Form for job details ---
-with st.form("job_details_form"):
-    st.subheader("🎯 Job Details")
-    col1, col2 = st.columns(2)
-    with col1:
-        job_role_input = st.text_input(
-            "Job Position/Title",
-            st.session_state.get("job_role", ""),
-            help="E.g., 'Senior Python Developer', 'Machine Learning Engineer'"
-        )
-    with col2:
-        company_name_input = st.text_input(
-            "Company Name",
-            st.session_state.get("company_name", ""),
-            help="The company you're applying to"
-        )
-    job_description_input = st.text_area(
-        "Paste Job Description Here",
-        st.session_state.get("job_description", ""),
-        height=250,
-        help="Copy and paste the complete job description from the job posting"
-    )
-    submit_button = st.form_submit_button("🚀 Analyze Job Match")
-    question_input = st.text_input("Question asked",
-               st.session_state.get("question", ""),                    
-            help="E.g., 'Where do you see yourself in next 2 years ?', 'Why we should hire you ?'")
-    ask_question_btn = st.form_submit_button("Answer on my Behalf")
-
+# --- Pipeline shared by both form buttons ---
+def run_pipeline(task, job_role, company_name, job_description, question=None):
+    """
+    Validates inputs, fetches GitHub data (cached) and runs the Gemini request.
+    `task` is "analyze" (structured analysis via display_results) or "answer"
+    (streams an answer to `question`).
+    """
+    # Persist form inputs
+    st.session_state.job_role = job_role
+    st.session_state.company_name = company_name
+    st.session_state.job_description = job_description
+    if task == "answer":
+        st.session_state.question = question
 
-if ask_question_btn:
-    st.session_state.question=question_input
-    st.session_state.job_role = job_role_input
-    st.session_state.company_name = company_name_input
-    st.session_state.job_description = job_description_input
+    # Validation
     valid_inputs = True
-    if not st.session_state.get("question"):
+    if task == "answer" and not question:
         st.error("❗ Please enter your Question.")
-        valid_inputs=False
-    
-    if not st.session_state.get("gemini_api_key"):
-        st.error("❗ Please enter your Gemini API Key in the sidebar.")
-        valid_inputs = False
-    # Get resume content (only from uploaded file now)
-    resume_text_main, resume_source = get_resume_content()
-    if not resume_text_main and resume_source != "error":
-        st.error("❗ No resume found. Please upload a 'resume.txt' file.")
-        valid_inputs = False
-    elif resume_source == "error":
-        # Error message already shown by get_resume_content
-        valid_inputs = False
-    elif resume_source == "upload":
-         st.info(f"✅ Using uploaded resume: '{st.session_state.uploaded_resume_filename}' for analysis.")
-          # Job details validation
-    if not job_role_input:
-        st.error("❗ Please enter the Job Position/Title.")
-        valid_inputs = False
-    if not company_name_input:
-        st.error("❗ Please enter the Company Name.")
-        valid_inputs = False
-    if not job_description_input:
-        st.error("❗ Please enter a Job Description.")
         valid_inputs = False
 
-    # Optional GitHub username validation (warning, not blocking)
-    github_username_to_fetch = st.session_state.get("github_username")
-    if not github_username_to_fetch:
-        st.warning("⚠️ GitHub Username is not entered. Analysis will proceed without GitHub project data.")
-
-   
-
-    if valid_inputs:
-        progress_bar_main = st.progress(0, text="⏳ Starting analysis...")
-        status_text_main = st.empty()
-
-        # Step 1: Fetch GitHub data (only if username provided)
-        github_data_main = []
-        if github_username_to_fetch:
-            status_text_main.text(f"📡 Fetching GitHub repositories for '{github_username_to_fetch}'...")
-            progress_bar_main.progress(25, text=f"📡 Fetching GitHub repositories...")
-            # Pass the token from session state if available
-            @st.cache_data(ttl=600) # Cache for 10 minutes
-            def cached_fetch_github_repos(username, token):
-                return fetch_github_repos(username, token)
-            github_data_main = cached_fetch_github_repos(github_username_to_fetch,st.session_state.get("github_pat"))
-            if not github_data_main:
-                print("using non cached repo data")
-                github_data_main = fetch_github_repos(
-                    github_username_to_fetch,
-                    st.session_state.get("github_pat")
-                )
-            # fetch_github_repos handles its own errors/warnings
-        else:
-             status_text_main.text("ℹ️ Skipping GitHub repository fetch (no username provided).")
-             progress_bar_main.progress(25, text="ℹ️ Skipping GitHub repository fetch...")
-             time.sleep(0.5) # Small delay
-
-        # Step 2: Prepare data (Resume already loaded)
-        status_text_main.text("⚙️ Preparing data for analysis...")
-        progress_bar_main.progress(50, text="⚙️ Preparing data for analysis...")
-        time.sleep(0.2)
-
-        # Step 3: Call Gemini API
-        status_text_main.text("🧠 Analyzing with Gemini AI...")
-        progress_bar_main.progress(75, text="🧠 Analyzing with Gemini AI...")
-        analysis_result_main = answer_with_gemini(
-            github_data_main if isinstance(github_data_main, list) else [], # Ensure it's a list
-            resume_text_main,
-            question_input,
-            job_role_input,
-            company_name_input,
-            job_description_input,
-        )
-        # Step 4: Display results
-        status_text_main.text("✨ Analysis complete. Preparing results...")
-        progress_bar_main.progress(100, text="✨ Analysis complete!")
-        time.sleep(0.5)
-        status_text_main.empty()
-        progress_bar_main.empty()
-        st.header(question_input)
-        st.markdown(analysis_result_main)
-
-
-    
-
-# --- Process when form is submitted ---
-if submit_button:
-    # Persist form inputs
-    st.session_state.job_role = job_role_input
-    st.session_state.company_name = company_name_input
-    st.session_state.job_description = job_description_input
-
-    # Validation
-    valid_inputs = True
     if not st.session_state.get("gemini_api_key"):
         st.error("❗ Please enter your Gemini API Key in the sidebar.")
         valid_inputs = False
@@ -563,69 +840,108 @@ if submit_button:
         st.warning("⚠️ GitHub Username is not entered. Analysis will proceed without GitHub project data.")
 
     # Job details validation
-    if not job_role_input:
+    if not job_role:
         st.error("❗ Please enter the Job Position/Title.")
         valid_inputs = False
-    if not company_name_input:
+    if not company_name:
         st.error("❗ Please enter the Company Name.")
         valid_inputs = False
-    if not job_description_input:
+    if not job_description:
         st.error("❗ Please enter a Job Description.")
         valid_inputs = False
 
-    # Proceed if all essential inputs are valid
-    if valid_inputs:
-        progress_bar_main = st.progress(0, text="⏳ Starting analysis...")
-        status_text_main = st.empty()
-
-        # Step 1: Fetch GitHub data (only if username provided)
-        github_data_main = []
-        if github_username_to_fetch:
-            status_text_main.text(f"📡 Fetching GitHub repositories for '{github_username_to_fetch}'...")
-            progress_bar_main.progress(25, text=f"📡 Fetching GitHub repositories...")
-            # Pass the token from session state if available
-            @st.cache_data(ttl=600) # Cache for 10 minutes
-            def cached_fetch_github_repos(username, token):
-                return fetch_github_repos(username, token)
-            github_data_main = cached_fetch_github_repos(github_username_to_fetch,st.session_state.get("github_pat"))
-            if not github_data_main:
-                print("using non cached repo data")
-                github_data_main = fetch_github_repos(
-                    github_username_to_fetch,
-                    st.session_state.get("github_pat")
-                )
-            # fetch_github_repos handles its own errors/warnings
-        else:
-             status_text_main.text("ℹ️ Skipping GitHub repository fetch (no username provided).")
-             progress_bar_main.progress(25, text="ℹ️ Skipping GitHub repository fetch...")
-             time.sleep(0.5) # Small delay
-
-        # Step 2: Prepare data (Resume already loaded)
-        status_text_main.text("⚙️ Preparing data for analysis...")
-        progress_bar_main.progress(50, text="⚙️ Preparing data for analysis...")
-        time.sleep(0.2)
-
-        # Step 3: Call Gemini API
-        status_text_main.text("🧠 Analyzing with Gemini AI...")
-        progress_bar_main.progress(75, text="🧠 Analyzing with Gemini AI...")
+    if not valid_inputs:
+        st.warning("Analysis cannot proceed due to missing inputs or errors. Please check the messages above.")
+        return
+
+    progress_bar_main = st.progress(0, text="⏳ Starting analysis...")
+    status_text_main = st.empty()
+
+    # Step 1: Fetch GitHub data (only if username provided)
+    if github_username_to_fetch:
+        status_text_main.text(f"📡 Fetching GitHub repositories for '{github_username_to_fetch}'...")
+        progress_bar_main.progress(25, text=f"📡 Fetching GitHub repositories...")
+        # Pass the token from session state if available; the prompt JSON comes pre-serialized
+        _, github_json_main = get_github_repos(github_username_to_fetch, st.session_state.get("github_pat"))
+        # fetch_github_repos handles its own errors/warnings
+    else:
+         status_text_main.text("ℹ️ Skipping GitHub repository fetch (no username provided).")
+         progress_bar_main.progress(25, text="ℹ️ Skipping GitHub repository fetch...")
+         github_json_main = serialize_github_data([])
+         time.sleep(0.5) # Small delay
+
+    # Step 2: Prepare data (Resume already loaded)
+    status_text_main.text("⚙️ Preparing data for analysis...")
+    progress_bar_main.progress(50, text="⚙️ Preparing data for analysis...")
+    time.sleep(0.2)
+
+    # Step 3: Call Gemini API
+    status_text_main.text("🧠 Analyzing with Gemini AI...")
+    progress_bar_main.progress(75, text="🧠 Analyzing with Gemini AI...")
+    if task == "answer":
+        # Stream the answer below the question as it is generated
+        st.header(question)
+        st.write_stream(answer_with_gemini(
+            github_json_main,
+            resume_text_main,
+            question,
+            job_role,
+            company_name,
+            job_description,
+        ))
+    else:
         analysis_result_main = analyze_with_gemini(
-            github_data_main if isinstance(github_data_main, list) else [], # Ensure it's a list
+            github_json_main,
             resume_text_main,
-            job_description_input,
-            job_role_input,
-            company_name_input
+            job_description,
+            job_role,
+            company_name
         )
 
-        # Step 4: Display results
-        status_text_main.text("✨ Analysis complete. Preparing results...")
-        progress_bar_main.progress(100, text="✨ Analysis complete!")
-        time.sleep(0.5)
-        status_text_main.empty()
-        progress_bar_main.empty()
+    # Step 4: Display results
+    status_text_main.text("✨ Analysis complete. Preparing results...")
+    progress_bar_main.progress(100, text="✨ Analysis complete!")
+    time.sleep(0.5)
+    status_text_main.empty()
+    progress_bar_main.empty()
 
+    if task == "analyze":
         display_results(analysis_result_main)
-    else:
-        st.warning("Analysis cannot proceed due to missing inputs or errors. Please check the messages above.")
+
+# --- Form for job details ---
+with st.form("job_details_form"):
+    st.subheader("🎯 Job Details")
+    col1, col2 = st.columns(2)
+    with col1:
+        job_role_input = st.text_input(
+            "Job Position/Title",
+            st.session_state.get("job_role", ""),
+            help="E.g., 'Senior Python Developer', 'Machine Learning Engineer'"
+        )
+    with col2:
+        company_name_input = st.text_input(
+            "Company Name",
+            st.session_state.get("company_name", ""),
+            help="The company you're applying to"
+        )
+    job_description_input = st.text_area(
+        "Paste Job Description Here",
+        st.session_state.get("job_description", ""),
+        height=250,
+        help="Copy and paste the complete job description from the job posting"
+    )
+    submit_button = st.form_submit_button("🚀 Analyze Job Match")
+    question_input = st.text_input("Question asked",
+               st.session_state.get("question", ""),                    
+            help="E.g., 'Where do you see yourself in next 2 years ?', 'Why we should hire you ?'")
+    ask_question_btn = st.form_submit_button("Answer on my Behalf")
+
+
+# --- Process when either form button is submitted ---
+if ask_question_btn:
+    run_pipeline("answer", job_role_input, company_name_input, job_description_input, question_input)
+elif submit_button:
+    run_pipeline("analyze", job_role_input, company_name_input, job_description_input)
 
 
 # --- Footer ---
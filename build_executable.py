@@ -1,50 +1,82 @@
+import importlib.util
 import os
 import platform
 import subprocess
 import sys
 
-def build_executable():
-    """Build the executable using PyInstaller"""
-    print("Starting build process...")
-    
-    # Determine the system
-    system = platform.system()
-    print(f"Building for {system} platform")
+APP_NAME = "Resume Job Match Analyzer"
+SPEC_FILE = f"{APP_NAME}.spec"
+# Inputs that change what PyInstaller has to analyze; the spec is regenerated when any is newer
+SPEC_INPUTS = ["app.py", "main.py", "requirements.txt", "build_executable.py"]
+
+# Per-platform PyInstaller options. --windowed (same as --noconsole) keeps a console window
+# from opening next to the app on Windows and produces a proper .app bundle on macOS; PyInstaller
+# ignores it on Linux, so it is not passed there.
+PLATFORM_OPTS = {
+    "Windows": ["--icon", "icon.ico", "--windowed"],
+    "Darwin": ["--icon", "icon.icns", "--windowed", "--osx-bundle-identifier", "com.yourcompany.resumeanalyzer"],
+    "Linux": ["--icon", "icon.png"],
+}
+
+def spec_is_current():
+    """Return True if a previously generated spec is newer than all of its inputs"""
+    if not os.path.exists(SPEC_FILE):
+        return False
+    spec_mtime = os.path.getmtime(SPEC_FILE)
+    return all(
+        os.path.getmtime(path) < spec_mtime
+        for path in SPEC_INPUTS
+        if os.path.exists(path)
+    )
+
+def full_pyinstaller_command(system):
+    """Build the full PyInstaller command line, which also (re)generates the spec file"""
+    # Locate Streamlit's static assets in the installed package (site-packages layout differs per OS)
+    streamlit_spec = importlib.util.find_spec("streamlit")
+    if streamlit_spec is None:
+        print("Build failed! Streamlit is not installed in this environment.")
+        sys.exit(1)
+    streamlit_static = os.path.join(streamlit_spec.submodule_search_locations[0], "runtime", "static")
     
     # Base PyInstaller command
     pyinstaller_command = [
         "pyinstaller",
         "--noconfirm",
         "--clean",
-        "--name", "Resume Job Match Analyzer",
+        # One directory (no per-launch self-extraction) and no UPX pass over the binaries
+        "--onedir",
+        "--noupx",
+        "--name", APP_NAME,
         "--add-data", f"app.py{os.pathsep}.",
+        # app.py is bundled as data, so PyInstaller never sees its imports; list them here by module name
         "--hidden-import", "streamlit",
-        "--hidden-import", "PyGithub",
         "--hidden-import", "google.generativeai",
-        "--hidden-import", "pywebview",
+        "--hidden-import", "orjson",
+        "--hidden-import", "webview",
+        "--add-binary", f"{streamlit_static}{os.pathsep}streamlit/runtime/static",
     ]
     
     # Platform-specific settings
-    if system == "Windows":
-        pyinstaller_command.extend([
-            "--icon", "icon.ico",
-            "--noconsole",
-            "--add-binary", f"{sys.prefix}/Lib/site-packages/streamlit/runtime/static{os.pathsep}streamlit/runtime/static"
-        ])
-    elif system == "Darwin":  # macOS
-        pyinstaller_command.extend([
-            "--icon", "icon.icns",
-            "--add-binary", f"{sys.prefix}/Lib/site-packages/streamlit/runtime/static{os.pathsep}streamlit/runtime/static",
-            "--osx-bundle-identifier", "com.yourcompany.resumeanalyzer"
-        ])
-    elif system == "Linux":
-        pyinstaller_command.extend([
-            "--icon", "icon.png",
-            "--add-binary", f"{sys.prefix}/Lib/site-packages/streamlit/runtime/static{os.pathsep}streamlit/runtime/static"
-        ])
+    pyinstaller_command.extend(PLATFORM_OPTS.get(system, []))
     
     # Add the main script
     pyinstaller_command.append("main.py")
+    return pyinstaller_command
+
+def build_executable():
+    """Build the executable using PyInstaller"""
+    print("Starting build process...")
+    
+    # Determine the system
+    system = platform.system()
+    print(f"Building for {system} platform")
+    
+    if spec_is_current():
+        # Rebuild from the existing spec and keep PyInstaller's analysis cache (no --clean)
+        print(f"Reusing {SPEC_FILE}")
+        pyinstaller_command = ["pyinstaller", "--noconfirm", SPEC_FILE]
+    else:
+        pyinstaller_command = full_pyinstaller_command(system)
     
     try:
         # Run PyInstaller
@@ -58,4 +90,4 @@ def build_executable():
         sys.exit(1)
 
 if __name__ == "__main__":
-    build_executable()
\ No newline at end of file
+    build_executable()
@@ -1,44 +1,225 @@
 import sys
 import os
 import threading
-import webview
 import subprocess
 import socket
 import time
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
 import tempfile
 import atexit
 import signal
+import urllib.request
+import urllib.error
+import struct
+import asyncio
 
 # Setup logging to file
 log_dir = os.path.join(tempfile.gettempdir(), 'resume_analyzer_logs')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'resume_analyzer.log')
+streamlit_log_file = os.path.join(log_dir, 'streamlit.out')
 
 logger = logging.getLogger('resume_analyzer')
 logger.setLevel(logging.INFO)
 handler = RotatingFileHandler(log_file, maxBytes=1024*1024, backupCount=3)
 formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 # Console handler for debugging
 console = logging.StreamHandler()
 console.setLevel(logging.INFO)
 console.setFormatter(formatter)
-logger.addHandler(console)
 
-def find_free_port():
-    """Find a free port to run the Streamlit app on"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('localhost', 0))
-        return s.getsockname()[1]
+# Log calls only enqueue the record; a listener thread does the file and console I/O
+# (including rotation), keeping it off the startup and shutdown paths
+log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, handler, console, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
 
-def is_port_in_use(port):
-    """Check if a port is in use"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+# Grace period for Streamlit to exit on SIGTERM before SIGKILL: 50 polls of 10ms (500ms)
+SHUTDOWN_POLL_INTERVAL = 0.01
+SHUTDOWN_POLL_STEPS = 50
+
+# Streamlit server options, used both as CLI flags and for the in-process server
+STREAMLIT_OPTIONS = {
+    "server.headless": True,
+    "server.enableCORS": False,
+    "server.enableXsrfProtection": False,
+    "browser.serverAddress": "localhost",
+    "browser.gatherUsageStats": False,
+    "server.address": "localhost",
+    # The bundled script never changes at runtime; skip starting the file watcher
+    "server.fileWatcherType": "none",
+}
+
+def user_cache_dir():
+    """Per-user cache directory for the app; unlike the temp dir it survives reboots"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'ResumeJobMatchAnalyzer')
+
+# Port tried first for the Streamlit app. A stable origin lets the webview's persistent HTTP
+# cache (EdgeChromium on Windows) be reused across launches; a random port is the fallback.
+PREFERRED_PORT = 8531
+
+def reserve_free_port():
+    """Reserve a port for the Streamlit app, returning the bound socket and the port.
+    PREFERRED_PORT is tried first, then any free port.
+    The caller keeps the socket open until just before Streamlit binds the port, so no other
+    process can take it in between. On POSIX, SO_REUSEADDR lets Streamlit rebind it right away;
+    on Windows that option would let any other socket share the port, so SO_EXCLUSIVEADDRUSE is
+    used instead."""
+    for candidate in (PREFERRED_PORT, 0):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name == 'nt':
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(('localhost', candidate))
+        except OSError:
+            s.close()
+            if candidate == 0:
+                raise
+            logger.info(f"Port {candidate} is in use, falling back to a free port")
+            continue
+        return s, s.getsockname()[1]
+
+def assign_to_kill_on_close_job(process):
+    """Place a Windows process in a Job Object that kills every process in it when the job is
+    terminated or its last handle is closed (including when this launcher dies).
+    Returns the job handle, or None if the job could not be set up."""
+    import ctypes
+    from ctypes import wintypes
+    
+    class IO_COUNTERS(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_ulonglong) for name in (
+            'ReadOperationCount', 'WriteOperationCount', 'OtherOperationCount',
+            'ReadTransferCount', 'WriteTransferCount', 'OtherTransferCount',
+        )]
+    
+    class JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ('PerProcessUserTimeLimit', wintypes.LARGE_INTEGER),
+            ('PerJobUserTimeLimit', wintypes.LARGE_INTEGER),
+            ('LimitFlags', wintypes.DWORD),
+            ('MinimumWorkingSetSize', ctypes.c_size_t),
+            ('MaximumWorkingSetSize', ctypes.c_size_t),
+            ('ActiveProcessLimit', wintypes.DWORD),
+            ('Affinity', ctypes.c_size_t),
+            ('PriorityClass', wintypes.DWORD),
+            ('SchedulingClass', wintypes.DWORD),
+        ]
+    
+    class JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ('BasicLimitInformation', JOBOBJECT_BASIC_LIMIT_INFORMATION),
+            ('IoInfo', IO_COUNTERS),
+            ('ProcessMemoryLimit', ctypes.c_size_t),
+            ('JobMemoryLimit', ctypes.c_size_t),
+            ('PeakProcessMemoryUsed', ctypes.c_size_t),
+            ('PeakJobMemoryUsed', ctypes.c_size_t),
+        ]
+    
+    JobObjectExtendedLimitInformation = 9
+    JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x2000
+    
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    kernel32.CreateJobObjectW.argtypes = (wintypes.LPVOID, wintypes.LPCWSTR)
+    kernel32.SetInformationJobObject.argtypes = (wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD)
+    kernel32.AssignProcessToJobObject.argtypes = (wintypes.HANDLE, wintypes.HANDLE)
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    
+    job = kernel32.CreateJobObjectW(None, None)
+    if not job:
+        logger.error(f"CreateJobObjectW failed: {ctypes.get_last_error()}")
+        return None
+    
+    info = JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+    info.BasicLimitInformation.LimitFlags = JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    if not (kernel32.SetInformationJobObject(job, JobObjectExtendedLimitInformation,
+                                             ctypes.byref(info), ctypes.sizeof(info))
+            and kernel32.AssignProcessToJobObject(job, int(process._handle))):
+        logger.error(f"Could not assign Streamlit to a job object: {ctypes.get_last_error()}")
+        kernel32.CloseHandle(job)
+        return None
+    return job
+
+def terminate_job(job):
+    """Kill every process in a Job Object with a single call and release the handle"""
+    import ctypes
+    from ctypes import wintypes
+    
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.TerminateJobObject.argtypes = (wintypes.HANDLE, wintypes.UINT)
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    try:
+        if not kernel32.TerminateJobObject(job, 1):
+            raise OSError(f"TerminateJobObject failed: {ctypes.get_last_error()}")
+    finally:
+        kernel32.CloseHandle(job)
+
+# Native extensions in the bundle that Streamlit (and pyarrow, grpc, ...) load on import
+PREFETCH_SUFFIXES = ('.so', '.pyd', '.dll', '.dylib')
+
+def prefetch_bundle_files(base_dir):
+    """Pull the bundle's native extensions into the OS page cache on a background thread,
+    so first-launch disk reads overlap with Streamlit's startup instead of stalling its imports"""
+    def prefetch():
+        buffer = bytearray(1024 * 1024)
+        for root, _, files in os.walk(base_dir):
+            for name in files:
+                if not name.endswith(PREFETCH_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    if hasattr(os, 'posix_fadvise'):
+                        # Asynchronous kernel readahead of the whole file
+                        fd = os.open(path, os.O_RDONLY)
+                        try:
+                            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                        finally:
+                            os.close(fd)
+                    else:
+                        # Windows/macOS: a sequential read leaves the file in the page cache
+                        with open(path, 'rb', buffering=0) as f:
+                            while f.readinto(buffer):
+                                pass
+                except OSError:
+                    pass  # Prefetching is best-effort
+    
+    threading.Thread(target=prefetch, name="bundle-prefetch", daemon=True).start()
+
+def run_streamlit_in_process(script_path, port):
+    """Run the Streamlit server inside this process on a daemon thread.
+    Avoids starting a second interpreter (and importing everything again) in the bundled app.
+    Streamlit's script-runner threads are not daemons, so main() ends the process with
+    os._exit rather than waiting for an in-flight script run."""
+    from streamlit.web import bootstrap
+    
+    flag_options = {**STREAMLIT_OPTIONS, "server.port": port}
+    bootstrap.load_config_options(flag_options=flag_options)
+    # Signal handlers can only be installed from the main thread, which belongs to webview
+    bootstrap._set_up_signal_handler = lambda server: None
+    
+    def serve():
+        try:
+            bootstrap.run(script_path, False, [], flag_options)
+        except Exception as e:
+            logger.error(f"Streamlit server stopped: {e}")
+    
+    server_thread = threading.Thread(target=serve, name="streamlit-server", daemon=True)
+    server_thread.start()
+    return server_thread
 
 def run_streamlit(script_path, port):
     """Run the Streamlit app"""
@@ -59,6 +240,15 @@ def run_streamlit(script_path, port):
         logger.error(f"Script not found: {script_path}")
         return None
     
+    # In a PyInstaller bundle sys.executable is the app itself, so serve in-process
+    if getattr(sys, 'frozen', False):
+        prefetch_bundle_files(base_dir)
+        try:
+            return run_streamlit_in_process(script_path, port)
+        except Exception as e:
+            logger.error(f"Error starting Streamlit: {e}")
+            return None
+    
     try:
         # Create a process for streamlit run
         streamlit_cmd = [
@@ -67,30 +257,34 @@ def run_streamlit(script_path, port):
             "run", 
             script_path,
             "--server.port", str(port),
-            "--server.headless", "true",
-            "--server.enableCORS", "false",
-            "--server.enableXsrfProtection", "false",
-            "--browser.serverAddress", "localhost",
-            "--browser.gatherUsageStats", "false",
-            "--server.address", "localhost"
         ]
+        for name, value in STREAMLIT_OPTIONS.items():
+            streamlit_cmd.extend([f"--{name}", str(value).lower()])
         
-        # Redirect stdout and stderr to prevent console windows on Windows
-        if os.name == 'nt':  # Windows
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            process = subprocess.Popen(
-                streamlit_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                startupinfo=startupinfo
-            )
-        else:  # Unix/Linux/Mac
-            process = subprocess.Popen(
-                streamlit_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+        # Redirect stdout and stderr to a log file to prevent console windows on Windows.
+        # A file never fills up like an undrained PIPE, which would block Streamlit on write().
+        # The child keeps its own handle, so ours can be closed once it has started.
+        with open(streamlit_log_file, 'wb') as streamlit_log:
+            if os.name == 'nt':  # Windows
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                process = subprocess.Popen(
+                    streamlit_cmd,
+                    stdout=streamlit_log,
+                    stderr=subprocess.STDOUT,
+                    startupinfo=startupinfo,
+                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+                )
+                # Children inherit the job, so cleanup can kill the whole tree in one call
+                process.job_handle = assign_to_kill_on_close_job(process)
+            else:  # Unix/Linux/Mac
+                # New session (process group id == pid) so cleanup can signal all descendants
+                process = subprocess.Popen(
+                    streamlit_cmd,
+                    stdout=streamlit_log,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True
+                )
         
         # Store the process object to terminate it later
         return process
@@ -99,40 +293,104 @@ def run_streamlit(script_path, port):
         logger.error(f"Error starting Streamlit: {e}")
         return None
 
+def _probe_socket():
+    """Create a non-blocking TCP socket for probing localhost.
+    SO_LINGER with a zero timeout makes close() send RST instead of FIN, so repeated probes
+    (and rapid relaunches) don't leave connections behind in TIME_WAIT."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # struct linger is two ints on POSIX and two u_shorts on Winsock
+    linger = struct.pack('HH' if os.name == 'nt' else 'ii', 1, 0)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, linger)
+    s.setblocking(False)
+    return s
+
+async def _wait_for_port_async(port, deadline):
+    """Event-loop version of wait_for_port: each connect attempt is awaited with a short
+    timeout and retried as soon as it is refused, with a small backoff between refusals"""
+    loop = asyncio.get_running_loop()
+    delay = 0.01
+    while time.time() < deadline:
+        s = _probe_socket()
+        try:
+            await asyncio.wait_for(loop.sock_connect(s, ('localhost', port)), 0.05)
+            return True
+        except (OSError, asyncio.TimeoutError):
+            pass  # Refused or still pending: nothing listening yet
+        finally:
+            s.close()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.2)
+    return False
+
+def wait_for_port(port, deadline):
+    """Wait until localhost:port accepts TCP connections.
+    Runs the probe on a private event loop, so it is safe to call from any thread."""
+    return asyncio.run(_wait_for_port_async(port, deadline))
+
 def wait_for_streamlit(port, timeout=30):
-    """Wait for Streamlit to start"""
+    """Wait for Streamlit's health endpoint to report ready, polling with exponential backoff"""
     logger.info(f"Waiting for Streamlit to be ready on port {port}...")
-    start_time = time.time()
+    health_url = f"http://localhost:{port}/_stcore/health"
+    # Never route the local health check through a proxy from the environment or registry
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    deadline = time.time() + timeout
     
-    while time.time() - start_time < timeout:
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                if s.connect_ex(('localhost', port)) == 0:
-                    # Wait additional time for the server to fully initialize
-                    time.sleep(2)
-                    logger.info("Streamlit server is ready!")
-                    return True
-        except Exception:
-            pass
-        
-        time.sleep(0.5)
+    # Cheap TCP check first; HTTP requests only start once the server is listening
+    if wait_for_port(port, deadline):
+        delay = 0.01
+        while time.time() < deadline:
+            try:
+                with opener.open(health_url, timeout=0.1) as response:
+                    if response.status == 200:
+                        logger.info("Streamlit server is ready!")
+                        return True
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass  # Still starting up (503)
+            
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
     
     logger.error("Timeout waiting for Streamlit to start")
     return False
 
+def launch_streamlit_in_background(script_path, port, launch_state, ready_event):
+    """Start Streamlit and wait for it to be ready, then set ready_event.
+    Runs on a background thread so the window setup overlaps with Streamlit's startup."""
+    launch_state["process"] = run_streamlit(script_path, port)
+    if launch_state["process"]:
+        launch_state["ready"] = wait_for_streamlit(port)
+    ready_event.set()
+
 def cleanup(streamlit_process):
     """Clean up resources when the app is closed"""
-    if streamlit_process:
+    # Only subprocesses need terminating; main() exits the process for an in-process server
+    # Runs from both main()'s finally block and atexit; only the first call does anything
+    if isinstance(streamlit_process, subprocess.Popen) and not getattr(streamlit_process, 'terminated', False):
+        streamlit_process.terminated = True
         logger.info("Terminating Streamlit process...")
         try:
             if os.name == 'nt':  # Windows
-                # On Windows, we need to use taskkill to ensure child processes are also terminated
-                subprocess.call(['taskkill', '/F', '/T', '/PID', str(streamlit_process.pid)])
-            else:
-                # On Unix systems, terminate the process group
-                streamlit_process.terminate()
-                streamlit_process.wait(timeout=5)
+                job = getattr(streamlit_process, 'job_handle', None)
+                if job:
+                    terminate_job(job)
+                elif streamlit_process.poll() is None:
+                    # No job object was created: fall back to taskkill to ensure child processes are also terminated
+                    subprocess.call(['taskkill', '/F', '/T', '/PID', str(streamlit_process.pid)])
+            elif streamlit_process.poll() is None:
+                # On Unix systems, terminate the whole process group, escalating to SIGKILL.
+                # Only while the leader is unreaped: killpg bypasses Popen's returncode guard,
+                # and once reaped the group id may belong to another process.
+                # Poll in 10ms steps so a fast exit isn't held up by a long blocking wait.
+                os.killpg(streamlit_process.pid, signal.SIGTERM)
+                for _ in range(SHUTDOWN_POLL_STEPS):
+                    if streamlit_process.poll() is not None:
+                        break
+                    time.sleep(SHUTDOWN_POLL_INTERVAL)
+                if streamlit_process.poll() is None:
+                    os.killpg(streamlit_process.pid, signal.SIGKILL)
                 
+        except ProcessLookupError:
+            pass  # Process group already gone
         except Exception as e:
             logger.error(f"Error terminating Streamlit process: {e}")
             # Force kill if terminate fails
@@ -141,31 +399,57 @@ def cleanup(streamlit_process):
             except:
                 pass
 
+def install_interrupt_cleanup(launch_state):
+    """Run cleanup as soon as Ctrl+C arrives, even while the main thread is blocked in the GUI loop.
+    The C-level signal handler writes to the wakeup socket immediately; a Python handler would
+    only run once the native event loop hands control back to the interpreter."""
+    reader, writer = socket.socketpair()  # A socket works as a wakeup fd on Windows too
+    writer.setblocking(False)
+    signal.signal(signal.SIGINT, lambda sig, frame: None)
+    signal.set_wakeup_fd(writer.fileno())
+    
+    def wait_for_interrupt(reader, writer):
+        # writer is passed in only to keep the wakeup socket open for the life of the thread
+        reader.recv(1)
+        logger.info("Received interrupt signal, shutting down...")
+        cleanup(launch_state["process"])
+        # os._exit skips atexit, so flush the queued log records first
+        log_listener.stop()
+        os._exit(0)
+    
+    threading.Thread(
+        target=wait_for_interrupt,
+        args=(reader, writer),
+        name="interrupt-cleanup",
+        daemon=True
+    ).start()
+
 def main():
     logger.info("Starting Resume Job Match Analyzer...")
     
-    # Find a free port
-    port = find_free_port()
-    streamlit_process = None
+    # Reserve a port (the preferred one when it is free)
+    port_socket, port = reserve_free_port()
+    # Shared with the launcher thread so the main thread can clean up the process
+    launch_state = {"process": None, "ready": False}
+    # Signal handling must be set up from the main thread
+    install_interrupt_cleanup(launch_state)
     
     try:
-        # Start Streamlit in a separate process
-        streamlit_process = run_streamlit("app.py", port)
-        
-        if not streamlit_process:
-            logger.error("Failed to start Streamlit")
-            return
+        # Release the port right before Streamlit binds it, then start Streamlit in the background
+        port_socket.close()
+        ready_event = threading.Event()
+        threading.Thread(
+            target=launch_streamlit_in_background,
+            args=("app.py", port, launch_state, ready_event),
+            daemon=True
+        ).start()
         
         # Register cleanup function
-        atexit.register(lambda: cleanup(streamlit_process))
-        
-        # Wait for Streamlit to start
-        if not wait_for_streamlit(port):
-            logger.error("Streamlit failed to start in time")
-            cleanup(streamlit_process)
-            return
+        atexit.register(lambda: cleanup(launch_state["process"]))
         
-        # Create the window
+        # Import the GUI toolkit (pythonnet/gi behind pywebview) and create the window
+        # while Streamlit is still starting up, rather than before it is even launched
+        import webview
         webview.create_window(
             title="Resume Job Match Analyzer",
             url=f"http://localhost:{port}",
@@ -175,21 +459,37 @@ def main():
             confirm_close=True
         )
         
+        # Wait for Streamlit to start
+        if not ready_event.wait(timeout=30) or not launch_state["ready"]:
+            if not launch_state["process"]:
+                logger.error("Failed to start Streamlit")
+            else:
+                logger.error("Streamlit failed to start in time")
+            return
+        
         # Start the webview
-        webview.start(gui="edgechromium" if os.name == 'nt' else "gtk")
+        # Non-private mode keeps the browser profile between launches. With EdgeChromium
+        # (Windows) that includes the HTTP cache, so Streamlit's content-hashed JS/CSS bundles
+        # load from disk instead of through Tornado; on GTK it only persists cookies.
+        webview_storage_dir = os.path.join(user_cache_dir(), 'webview')
+        os.makedirs(webview_storage_dir, exist_ok=True)
+        webview.start(
+            gui="edgechromium" if os.name == 'nt' else "gtk",
+            private_mode=False,
+            storage_path=webview_storage_dir
+        )
         
     except Exception as e:
         logger.error(f"Error in main: {e}")
     finally:
         # Clean up
-        cleanup(streamlit_process)
+        cleanup(launch_state["process"])
         logger.info("Application closed")
+        if isinstance(launch_state["process"], threading.Thread):
+            # Interpreter shutdown would wait for Streamlit's non-daemon script-runner threads,
+            # keeping the app running without a window until e.g. a Gemini stream finishes
+            log_listener.stop()
+            os._exit(0)
 
 if __name__ == '__main__':
-    # Handle SIGINT (Ctrl+C) gracefully
-    def signal_handler(sig, frame):
-        logger.info("Received interrupt signal, shutting down...")
-        sys.exit(0)
-    
-    signal.signal(signal.SIGINT, signal_handler)
     main()
\ No newline at end of file